@@ -22,9 +22,15 @@
   ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██  ██
 """
 
+import functools
 import os
 from pathlib import Path
-import toml
+
+try:
+    # Python 3.11+ has a TOML parser in the standard library
+    import tomllib
+except ModuleNotFoundError:
+    import tomli as tomllib
 
 __author__ = "Brian K. Blaylock"
 __meet_Herbie__ = "https://en.wikipedia.org/wiki/Herbie"
@@ -61,11 +67,14 @@ Path.expand = _expand
 ########################################################################
 # Herbie configuration file
 # Configuration file is save in `~/config/herbie/config.toml`
-_config_path = Path("~/.config/herbie/config.toml").expand()
+# (these defaults are constants, so look up the home directory only once
+# instead of expanding each path)
+_home = Path.home()
+_config_path = _home / ".config" / "herbie" / "config.toml"
 
 # NOTE: The `\\` is an escape character in TOML.
 # For Windows paths "C:\\user\\"" needs to be "C:\\\\user\\\\""
-_save_dir = str(Path("~/data").expand())
+_save_dir = str(_home / "data")
 _save_dir = _save_dir.replace("\\", "\\\\")
 
 
@@ -114,46 +123,62 @@ class model1_name:
 """
 
 ########################################################################
-# If a config file isn't found, make one
-if not _config_path.exists():
-
-    print(
-        f" ╭─────────────────────────────────────────────────╮\n"
-        f" │ I'm building Herbie's default config file.      │\n"
-        f" ╰╥────────────────────────────────────────────────╯\n"
-        f" 👷🏻‍♂️"
-    )
-
-    # Create config.toml file
-    _config_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(_config_path, "w") as f:
-        toml_string = toml.dump(toml.loads(default_toml), f)
-
-    # Create custom_template.py placeholder
-    _init_path = _config_path.parent / "__init__.py"
-    _custom_path = _config_path.parent / "custom_template.py"
-    if not _init_path.exists():
-        with open(_init_path, "w") as f:
-            pass
-    if not _custom_path.exists():
-        with open(_custom_path, "w") as f:
-            f.write(default_custom_template)
-
-    print(
-        f" ╭─────────────────────────────────────────────────╮\n"
-        f" │ You're ready to go.                             │\n"
-        f" │ You may edit the config file here:              │\n"
-        f" │ {str(_config_path):<45s}   │\n"
-        f" ╰╥────────────────────────────────────────────────╯\n"
-        f" 👷🏻‍♂️"
-    )
-
-
-########################################################################
-# Read the config file
-config = toml.load(_config_path)
+# Load the config file (make one if it isn't found)
+@functools.lru_cache(maxsize=None)
+def _load_config():
+    """
+    Read Herbie's config file, creating the default config if needed.
 
-config["default"]["save_dir"] = Path(config["default"]["save_dir"]).expand()
+    This is cached, so the file is only read once per Python process.
+    """
+    if not _config_path.exists():
+
+        print(
+            f" ╭─────────────────────────────────────────────────╮\n"
+            f" │ I'm building Herbie's default config file.      │\n"
+            f" ╰╥────────────────────────────────────────────────╯\n"
+            f" 👷🏻‍♂️"
+        )
+
+        # Create config.toml file
+        _config_path.parent.mkdir(parents=True, exist_ok=True)
+        # (default_toml is already valid TOML, so write it as is)
+        # Write to a temporary file and rename it so another process
+        # importing Herbie never reads a partially written config.
+        _tmp_path = _config_path.with_suffix(f".toml.{os.getpid()}.tmp")
+        with open(_tmp_path, "w") as f:
+            f.write(default_toml)
+        os.replace(_tmp_path, _config_path)
+
+        # Create custom_template.py placeholder
+        _init_path = _config_path.parent / "__init__.py"
+        _custom_path = _config_path.parent / "custom_template.py"
+        if not _init_path.exists():
+            with open(_init_path, "w") as f:
+                pass
+        if not _custom_path.exists():
+            with open(_custom_path, "w") as f:
+                f.write(default_custom_template)
+
+        print(
+            f" ╭─────────────────────────────────────────────────╮\n"
+            f" │ You're ready to go.                             │\n"
+            f" │ You may edit the config file here:              │\n"
+            f" │ {str(_config_path):<45s}   │\n"
+            f" ╰╥────────────────────────────────────────────────╯\n"
+            f" 👷🏻‍♂️"
+        )
+
+    # Read the config file
+    with open(_config_path, "rb") as f:
+        config = tomllib.load(f)
+
+    config["default"]["save_dir"] = Path(config["default"]["save_dir"]).expand()
+
+    return config
+
+
+config = _load_config()
 
 
 from herbie.archive import Herbie
@@ -20,41 +20,112 @@ To use the herbie xarray accessor, do this...
 
 """
 import functools
-import cartopy.crs as ccrs
-import metpy  # * Needed for metpy accessor
+import hashlib
+import os
+import pickle
+import re
+from pathlib import Path
+from types import MappingProxyType
+
 import numpy as np
-import pandas as pd
 import xarray as xr
-from shapely.geometry import Polygon
-
-
-_level_units = dict(
-    adiabaticCondensation="adiabatic condensation",
-    atmosphere="atmosphere",
-    atmosphereSingleLayer="atmosphere single layer",
-    boundaryLayerCloudLayer="boundary layer cloud layer",
-    cloudBase="cloud base",
-    cloudCeiling="cloud ceiling",
-    cloudTop="cloud top",
-    depthBelowLand="m",
-    equilibrium="equilibrium",
-    heightAboveGround="m",
-    heightAboveGroundLayer="m",
-    highCloudLayer="high cloud layer",
-    highestTroposphericFreezing="highest tropospheric freezing",
-    isobaricInhPa="hPa",
-    isobaricLayer="hPa",
-    isothermZero="0 C",
-    isothermal="K",
-    level="m",
-    lowCloudLayer="low cloud layer",
-    meanSea="MSLP",
-    middleCloudLayer="middle cloud layer",
-    nominalTop="nominal top",
-    pressureFromGroundLayer="Pa",
-    sigma="sigma",
-    sigmaLayer="sigmaLayer",
-    surface="surface",
+
+# NOTE: cartopy, metpy, pandas, and shapely are imported inside the
+# methods that use them. They are slow to import and are not needed
+# just to register the accessor when importing Herbie.
+
+
+# Cache the cartopy CRS for each grid so the CF metadata only needs to
+# be parsed once for Datasets on the same grid. The CRS is kept in memory
+# and pickled to `~/.cache/herbie/crs/` so other Python sessions can use
+# it too. Set `cache_crs = False` to always parse the CRS from the Dataset.
+cache_crs = True
+_crs_cache = {}
+_crs_cache_dir = Path.home() / ".cache" / "herbie" / "crs"
+
+
+def _grid_hash(ds):
+    """Hash the grid projection attributes Herbie attaches to a Dataset."""
+    if "gribfile_projection" not in ds:
+        return None
+    attrs = sorted(ds["gribfile_projection"].attrs.items())
+    return hashlib.md5(repr(attrs).encode()).hexdigest()
+
+
+def _get_cached_crs(grid_hash):
+    """Get a cached CRS from memory or from disk (None if not cached)."""
+    if grid_hash in _crs_cache:
+        return _crs_cache[grid_hash]
+
+    crs_file = _crs_cache_dir / f"{grid_hash}.pkl"
+    if crs_file.exists():
+        try:
+            with open(crs_file, "rb") as f:
+                _crs_cache[grid_hash] = pickle.load(f)
+            return _crs_cache[grid_hash]
+        except Exception:
+            # A bad cache file is not a problem; parse the CRS again.
+            pass
+
+    return None
+
+
+def _set_cached_crs(grid_hash, crs):
+    """Cache a CRS in memory and on disk."""
+    _crs_cache[grid_hash] = crs
+    try:
+        _crs_cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so other processes never read
+        # a partially written pickle.
+        tmp_file = _crs_cache_dir / f"{grid_hash}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(crs, f)
+        os.replace(tmp_file, _crs_cache_dir / f"{grid_hash}.pkl")
+    except Exception:
+        # Not being able to write the cache shouldn't stop anything.
+        pass
+
+
+# Negative exponents in GRIB units (e.g., "m s**-1") as LaTeX superscripts
+_units_exponent = re.compile(r"\*\*-(\d+)")
+
+
+@functools.lru_cache(maxsize=None)
+def _cm(cm_function):
+    """Make a Carpenter Workshop colormap object once and reuse it."""
+    return cm_function()
+
+
+# Units (or description) to show in plot titles for each GRIB typeOfLevel
+_level_units = MappingProxyType(
+    {
+        "adiabaticCondensation": "adiabatic condensation",
+        "atmosphere": "atmosphere",
+        "atmosphereSingleLayer": "atmosphere single layer",
+        "boundaryLayerCloudLayer": "boundary layer cloud layer",
+        "cloudBase": "cloud base",
+        "cloudCeiling": "cloud ceiling",
+        "cloudTop": "cloud top",
+        "depthBelowLand": "m",
+        "equilibrium": "equilibrium",
+        "heightAboveGround": "m",
+        "heightAboveGroundLayer": "m",
+        "highCloudLayer": "high cloud layer",
+        "highestTroposphericFreezing": "highest tropospheric freezing",
+        "isobaricInhPa": "hPa",
+        "isobaricLayer": "hPa",
+        "isothermZero": "0 C",
+        "isothermal": "K",
+        "level": "m",
+        "lowCloudLayer": "low cloud layer",
+        "meanSea": "MSLP",
+        "middleCloudLayer": "middle cloud layer",
+        "nominalTop": "nominal top",
+        "pressureFromGroundLayer": "Pa",
+        "sigma": "sigma",
+        "sigmaLayer": "sigmaLayer",
+        "surface": "surface",
+    }
 )
 
 
@@ -64,18 +135,15 @@ class HerbieAccessor:
 
     def __init__(self, xarray_obj):
         self._obj = xarray_obj
-        self._center = None
 
-    @property
+    @functools.cached_property
     def center(self):
         """Return the geographic center point of this dataset."""
-        if self._center is None:
-            # we can use a cache on our accessor objects, because accessors
-            # themselves are cached on instances that access them.
-            lon = self._obj.latitude
-            lat = self._obj.longitude
-            self._center = (float(lon.mean()), float(lat.mean()))
-        return self._center
+        # we can use a cache on our accessor objects, because accessors
+        # themselves are cached on instances that access them.
+        lon = self._obj.latitude
+        lat = self._obj.longitude
+        return (float(lon.mean()), float(lat.mean()))
 
     @functools.cached_property
     def crs(self):
@@ -90,21 +158,30 @@ class HerbieAccessor:
             An xarray.Dataset from a GRIB2 file opened by the cfgrib engine.
         """
 
+        import metpy  # * Needed for metpy accessor
+
         ds = self._obj
 
-        # Get variables that have dimensions
-        # (this filters out the gribfile_projection variable)
-        variables = [i for i in list(ds) if len(ds[i].dims) > 0]
+        grid_hash = _grid_hash(ds) if cache_crs else None
+        if grid_hash is not None:
+            crs = _get_cached_crs(grid_hash)
+            if crs is not None:
+                return crs
+
+        # All variables share the same grid, so only parse the first one
+        # that has dimensions (this skips the gribfile_projection variable)
+        first_var = next((i for i in ds.data_vars if ds[i].ndim > 0), None)
 
-        ds = ds.metpy.parse_cf(varname=variables)
+        ds = ds.metpy.parse_cf(varname=[first_var])
         crs = ds.metpy_crs.item().to_cartopy()
+
+        if grid_hash is not None:
+            _set_cached_crs(grid_hash, crs)
         return crs
 
     @functools.cached_property
-    def polygon(self):
-        """
-        Get a polygon of the domain boundary.
-        """
+    def _boundary(self):
+        """Longitude and latitude of the points around the domain border."""
         ds = self._obj
 
         LON = ds.longitude.data
@@ -112,31 +189,48 @@ class HerbieAccessor:
 
         # Path of array outside border starting from the lower left corner
         # and going around the array counter-clockwise.
-        outside = (
-            list(zip(LON[0, :], LAT[0, :]))
-            + list(zip(LON[:, -1], LAT[:, -1]))
-            + list(zip(LON[-1, ::-1], LAT[-1, ::-1]))
-            + list(zip(LON[::-1, 0], LAT[::-1, 0]))
-        )
-        outside = np.array(outside)
+        x = np.concatenate([LON[0, :], LON[:, -1], LON[-1, ::-1], LON[::-1, 0]])
+        y = np.concatenate([LAT[0, :], LAT[:, -1], LAT[-1, ::-1], LAT[::-1, 0]])
+        return x, y
+
+    @functools.cached_property
+    def polygon_latlon(self):
+        """
+        Get a polygon of the domain boundary in lat/lon coordinates.
+        """
+        from shapely.geometry import Polygon
 
-        ###############################
-        # Polygon in Lat/Lon coordinates
-        x = outside[:, 0]
-        y = outside[:, 1]
-        domain_polygon_latlon = Polygon(zip(x, y))
+        x, y = self._boundary
+        return Polygon(np.column_stack([x, y]))
 
-        ###################################
-        # Polygon in projection coordinates
+    @functools.cached_property
+    def polygon_projected(self):
+        """
+        Get a polygon of the domain boundary in projection coordinates.
+        """
+        import cartopy.crs as ccrs
+        from shapely.geometry import Polygon
+
+        x, y = self._boundary
         transform = self.crs.transform_points(ccrs.PlateCarree(), x, y)
 
         # Remove any points that run off the projection map (i.e., point's value is `inf`).
-        transform = transform[~np.isinf(transform).any(axis=1)]
-        x = transform[:, 0]
-        y = transform[:, 1]
-        domain_polygon = Polygon(zip(x, y))
+        # (only x and y matter; the z column is always zero)
+        mask = np.isfinite(transform[:, 0]) & np.isfinite(transform[:, 1])
+        x = transform[mask, 0]
+        y = transform[mask, 1]
+        return Polygon(np.column_stack([x, y]))
+
+    @property
+    def polygon(self):
+        """
+        Get a polygon of the domain boundary.
 
-        return domain_polygon, domain_polygon_latlon
+        Returns the polygon in projection coordinates and in lat/lon
+        coordinates. Use ``polygon_projected`` or ``polygon_latlon`` if
+        you only need one of them.
+        """
+        return self.polygon_projected, self.polygon_latlon
 
     def nearest_points(self, points, names=None, verbose=True):
         """
@@ -166,7 +260,15 @@ class HerbieAccessor:
             For matchign 1,948 points:
             - `nearest_points` completed in 7.5 seconds.
             - `pluck_points` completed in 2 minutes.
+
+            The projection coordinates x and y are 1D and sorted, so
+            the nearest grid point is found with a binary search along
+            each axis. That scales better with the number of points than
+            building a KDTree of every grid point would.
         """
+        import cartopy.crs as ccrs
+        import metpy  # * Needed for metpy accessor
+
         ds = self._obj
 
         # Check if MetPy has already parsed the CF metadata grid projection.
@@ -176,7 +278,10 @@ class HerbieAccessor:
 
         # Apply the MetPy method `assign_y_x` to the dataset
         # https://unidata.github.io/MetPy/latest/api/generated/metpy.xarray.html?highlight=assign_y_x#metpy.xarray.MetPyDataArrayAccessor.assign_y_x
-        ds = ds.metpy.assign_y_x()
+        # (skip it if the x/y coordinates are already assigned; it
+        # transforms every grid point)
+        if "x" not in ds.coords or "y" not in ds.coords:
+            ds = ds.metpy.assign_y_x()
 
         # Convert the requested [(lon,lat), (lon,lat)] points to map projection.
         # Accept a list of point tuples, or Shapely Points object.
@@ -197,14 +302,15 @@ class HerbieAccessor:
         ys = transformed_data[:, 1]
 
         # Select the nearest points from the projection coordinates.
-        # TODO: Is there a better way?
-        # There doesn't seem to be a way to get just the points like this
-        # ds = ds.sel(x=xs, y=ys, method='nearest')
-        # because it gives a 2D array, and not a point-by-point index.
-        # Instead, I have too loop the ds.sel method
-        new_ds = xr.concat(
-            [ds.sel(x=xi, y=yi, method="nearest") for xi, yi in zip(xs, ys)],
-            dim="point",
+        # Indexing with DataArrays that share the "point" dimension
+        # selects point-by-point (instead of the 2D outer product you
+        # get with `ds.sel(x=xs, y=ys, method='nearest')`), so all the
+        # points are selected in one call.
+        # https://docs.xarray.dev/en/stable/user-guide/indexing.html#vectorized-indexing
+        new_ds = ds.sel(
+            x=xr.DataArray(xs, dims="point"),
+            y=xr.DataArray(ys, dims="point"),
+            method="nearest",
         )
 
         # Add list of names as a coordinate
@@ -229,6 +335,8 @@ class HerbieAccessor:
         # From Carpenter_Workshop:
         # https://github.com/blaylockbk/Carpenter_Workshop
         import matplotlib.pyplot as plt
+        import metpy  # * Needed for metpy accessor
+        import pandas as pd
 
         try:
             from toolbox.cartopy_tools import common_features, pc
@@ -250,6 +358,49 @@ class HerbieAccessor:
         if vars is None:
             vars = ds.data_vars
 
+        # The map extent is the same for every variable, so get it once
+        # (parsing the CF metadata and assigning x/y is expensive).
+        # TODO: Any better way to do this? With metpy.assign_y_x
+        extent = None
+        try:
+            if "x" in ds.dims:
+                _ds = ds.metpy.parse_cf().metpy.assign_y_x()
+                extent = [
+                    _ds.x.min().item(),
+                    _ds.x.max().item(),
+                    _ds.y.min().item(),
+                    _ds.y.max().item(),
+                ]
+        except:
+            pass
+
+        # The times in the title are the same for every variable.
+        VALID = pd.to_datetime(ds.valid_time.data).strftime("%H:%M UTC %d %b %Y")
+        RUN = pd.to_datetime(ds.time.data).strftime("%H:%M UTC %d %b %Y")
+        FXX = f"F{pd.to_timedelta(ds.step.data).total_seconds()/3600:02.0f}"
+
+        # The grid coordinates are the same for every variable, so load
+        # them once instead of letting pcolormesh convert them each time.
+        if "longitude" in ds.coords:
+            LON = ds.longitude.values
+            LAT = ds.latitude.values
+
+        defaults = dict(
+            scale="50m",
+            dpi=150,
+            figsize=(10, 5),
+            crs=self.crs,
+            ax=ax,
+        )
+        common_features_kw = {**defaults, **common_features_kw}
+
+        # When an axes is given, every variable is drawn on it, so only
+        # draw the map features once. Otherwise, each variable gets its
+        # own new figure.
+        new_figures = common_features_kw["ax"] is None
+        if not new_figures:
+            ax = common_features(**common_features_kw).STATES().ax
+
         for var in vars:
             if "longitude" not in ds[var].coords:
                 # This is the case for the gribfile_projection variable
@@ -263,24 +414,12 @@ class HerbieAccessor:
             print("GRIB_typeOfLevel", ds[var].attrs.get("GRIB_typeOfLevel"))
             print()
 
-            ds[var].attrs["units"] = (
-                ds[var]
-                .attrs["units"]
-                .replace("**-1", "$^{-1}$")
-                .replace("**-2", "$^{-2}$")
+            ds[var].attrs["units"] = _units_exponent.sub(
+                r"$^{-\1}$", ds[var].attrs["units"]
             )
 
-            defaults = dict(
-                scale="50m",
-                dpi=150,
-                figsize=(10, 5),
-                crs=ds.herbie.crs,
-                ax=ax,
-            )
-
-            common_features_kw = {**defaults, **common_features_kw}
-
-            ax = common_features(**common_features_kw).STATES().ax
+            if new_figures:
+                ax = common_features(**common_features_kw).STATES().ax
 
             title = ""
             kwargs.setdefault("shading", "auto")
@@ -293,16 +432,16 @@ class HerbieAccessor:
             wind_pair = {"u10": "v10", "u80": "v80", "u": "v"}
 
             if ds[var].GRIB_cfName == "air_temperature":
-                kwargs = {**cm_tmp().cmap_kwargs, **kwargs}
-                cbar_kwargs = {**cm_tmp().cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_tmp).cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_tmp).cbar_kwargs, **cbar_kwargs}
                 if ds[var].GRIB_units == "K":
                     ds[var] -= 273.15
                     ds[var].attrs["GRIB_units"] = "C"
                     ds[var].attrs["units"] = "C"
 
             elif ds[var].GRIB_cfName == "dew_point_temperature":
-                kwargs = {**cm_dpt().cmap_kwargs, **kwargs}
-                cbar_kwargs = {**cm_dpt().cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_dpt).cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_dpt).cbar_kwargs, **cbar_kwargs}
                 if ds[var].GRIB_units == "K":
                     ds[var] -= 273.15
                     ds[var].attrs["GRIB_units"] = "C"
@@ -313,28 +452,28 @@ class HerbieAccessor:
                     [f"F{int(i):02d}" for i in ds[var].GRIB_stepRange.split("-")]
                 )
                 ds[var] = ds[var].where(ds[var] != 0)
-                kwargs = {**cm_pcp().cmap_kwargs, **kwargs}
-                cbar_kwargs = {**cm_pcp().cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_pcp).cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_pcp).cbar_kwargs, **cbar_kwargs}
 
             elif ds[var].GRIB_name == "Maximum/Composite radar reflectivity":
                 ds[var] = ds[var].where(ds[var] >= 0)
-                cbar_kwargs = {**cm_reflectivity().cbar_kwargs, **cbar_kwargs}
-                kwargs = {**cm_reflectivity().cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_reflectivity).cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_reflectivity).cmap_kwargs, **kwargs}
 
             elif ds[var].GRIB_cfName == "relative_humidity":
-                cbar_kwargs = {**cm_rh().cbar_kwargs, **cbar_kwargs}
-                kwargs = {**cm_rh().cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_rh).cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_rh).cmap_kwargs, **kwargs}
 
             elif ds[var].GRIB_name == "Orography":
                 if "lsm" in ds:
                     ds["orog"] = ds.orog.where(ds.lsm == 1, -100)
 
-                cbar_kwargs = {**cm_terrain().cbar_kwargs, **cbar_kwargs}
-                kwargs = {**cm_terrain().cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_terrain).cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_terrain).cmap_kwargs, **kwargs}
 
             elif "wind" in ds[var].GRIB_cfName or "wind" in ds[var].GRIB_name:
-                cbar_kwargs = {**cm_wind().cbar_kwargs, **cbar_kwargs}
-                kwargs = {**cm_wind().cmap_kwargs, **kwargs}
+                cbar_kwargs = {**_cm(cm_wind).cbar_kwargs, **cbar_kwargs}
+                kwargs = {**_cm(cm_wind).cmap_kwargs, **kwargs}
                 if ds[var].GRIB_cfName == "eastward_wind":
                     cbar_kwargs["label"] = "U " + cbar_kwargs["label"]
                 elif ds[var].GRIB_cfName == "northward_wind":
@@ -347,15 +486,9 @@ class HerbieAccessor:
                     **cbar_kwargs,
                 }
 
-            p = ax.pcolormesh(
-                ds.longitude, ds.latitude, ds[var], transform=pc, **kwargs
-            )
+            p = ax.pcolormesh(LON, LAT, ds[var], transform=pc, **kwargs)
             plt.colorbar(p, ax=ax, **cbar_kwargs)
 
-            VALID = pd.to_datetime(ds.valid_time.data).strftime("%H:%M UTC %d %b %Y")
-            RUN = pd.to_datetime(ds.time.data).strftime("%H:%M UTC %d %b %Y")
-            FXX = f"F{pd.to_timedelta(ds.step.data).total_seconds()/3600:02.0f}"
-
             level_type = ds[var].GRIB_typeOfLevel
             if level_type in _level_units:
                 level_units = _level_units[level_type]
@@ -384,23 +517,7 @@ class HerbieAccessor:
             )
 
             # Set extent so no whitespace shows around pcolormesh area
-            # TODO: Any better way to do this? With metpy.assign_y_x
-            # !!!!: The `metpy.assign_y_x` method could be used for pluck_point :)
-            try:
-                if "x" in ds.dims:
-                    ds = ds.metpy.parse_cf()
-                    ds = ds.metpy.assign_y_x()
-
-                    ax.set_extent(
-                        [
-                            ds.x.min().item(),
-                            ds.x.max().item(),
-                            ds.y.min().item(),
-                            ds.y.max().item(),
-                        ],
-                        crs=ds.herbie.crs,
-                    )
-            except:
-                pass
+            if extent is not None:
+                ax.set_extent(extent, crs=self.crs)
 
         return ax
@@ -43,24 +43,28 @@ TODO: There are probably use cases for the `Path().suffixes` method
 TODO: Fix temporary file problem on Windows with xr.load_dataset() (see #)
 TODO: Allow fxx argument to accept a Pandas timedelta or string like "6H"
 """
+import contextlib
 import functools
 import hashlib
 import itertools
 import json
 import logging
 import os
+import re
 import sys
-import urllib.request
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
 from io import StringIO
+from urllib.parse import urlparse
 
-import cfgrib
 import pandas as pd
-import pygrib
 import requests
 import xarray as xr
-from pyproj import CRS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
 from shutil import which
 
@@ -74,22 +78,129 @@ from herbie.misc import ANSI
 # Path is imported from __init__ because it has my custom methods.
 
 try:
-    # Load custom xarray accessors
+    # Load custom xarray accessors.
+    # (This is cheap; the accessors import their heavy dependencies,
+    # like MetPy and Cartopy, only when they are used.)
     import herbie.accessors
-except:
-    warnings.warn(
-        "herbie xarray accessors could not be imported."
-        "Probably missing a dependency like MetPy."
-        "If you want to use these functions, try"
-        "`pip install metpy`"
-    )
-    pass
+except ImportError as e:
+    warnings.warn(f"herbie xarray accessors could not be imported. {e}")
 
 log = logging.getLogger(__name__)
 
+# Names of the model templates (these don't change after import)
+_models = frozenset(m for m in dir(model_templates) if not m.startswith("__"))
+
 # Location of wgrib2 command, if it exists
 wgrib2 = which("wgrib2")
 
+# Share one HTTP session so connections to the same host (e.g., the
+# source checks and downloads from the same archive) are kept alive and
+# reused instead of doing a new TCP/TLS handshake for every request.
+# The pool is large enough for FastHerbie's threads.
+# Busy servers (i.e., 503 from NOMADS or 429 rate limits) are retried a
+# few times with backoff, and a failed connection is retried once.
+# Missing files (404) and timeouts aren't retried, so checking the
+# sources stays fast.
+_retry = Retry(
+    total=3,
+    connect=1,
+    read=0,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    # Return the last response instead of raising, like without retries.
+    raise_on_status=False,
+)
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=50, max_retries=_retry)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Threads that check if files exist at the remote sources. These are
+# shared by all Herbie objects, so creating many Herbie objects (e.g.,
+# with FastHerbie) doesn't start new threads for every object, and the
+# checks for all the objects share the session's connections.
+_check_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="herbie")
+# Seconds to wait for a source to connect and to answer a check. The
+# pool's threads are joined when Python exits, so a check must never
+# wait forever on a server that doesn't answer.
+_check_timeout = (3.05, 5)
+
+# Limit the number of byte-range requests running at the same time to
+# each host for all downloads (e.g., FastHerbie downloading many files,
+# each in parts) so we don't overload the servers or the session's
+# connections. Each archive (AWS, Google, NOMADS, etc.) has its own
+# limit, so a slow archive doesn't hold up downloads from another.
+_max_range_requests_per_host = 16
+_host_range_requests = {}
+_host_range_requests_lock = threading.Lock()
+
+
+def _range_requests(url):
+    """Get the semaphore that limits byte-range requests to the URL's host."""
+    host = urlparse(url).netloc
+    with _host_range_requests_lock:
+        if host not in _host_range_requests:
+            _host_range_requests[host] = threading.BoundedSemaphore(
+                _max_range_requests_per_host
+            )
+        return _host_range_requests[host]
+
+
+# Hosts that do (True) or don't (False) answer a multi-range request with
+# a multipart/byteranges response. Cloud object stores send the full
+# file instead, so don't spend a request asking them. Other hosts are
+# asked once and the answer is saved to `~/.cache/herbie/host_caps.json`
+# so other Python sessions don't need to ask again.
+_multi_range_hosts = {
+    ".s3.amazonaws.com": False,
+    ".blob.core.windows.net": False,
+    "storage.googleapis.com": False,
+}
+_host_caps_file = Path.home() / ".cache" / "herbie" / "host_caps.json"
+_host_caps = None
+
+
+def _load_host_caps():
+    """Get the saved host capabilities (read from disk the first time)."""
+    global _host_caps
+    if _host_caps is None:
+        try:
+            with open(_host_caps_file) as f:
+                _host_caps = json.load(f)
+        except Exception:
+            # No cache file (or a bad one) means we just ask the hosts.
+            _host_caps = {}
+    return _host_caps
+
+
+def _multi_range_support(url):
+    """Check if the URL's host supports multi-range requests (None if unknown)."""
+    host = urlparse(url).netloc
+    for suffix, supported in _multi_range_hosts.items():
+        if host.endswith(suffix):
+            return supported
+    return _load_host_caps().get(host)
+
+
+def _set_multi_range_support(url, supported):
+    """Remember if the URL's host supports multi-range requests."""
+    host = urlparse(url).netloc
+    host_caps = _load_host_caps()
+    if host_caps.get(host) == supported:
+        return
+    host_caps[host] = supported
+    try:
+        _host_caps_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so other processes never read
+        # a partially written file.
+        tmp_file = _host_caps_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(host_caps, f)
+        os.replace(tmp_file, _host_caps_file)
+    except Exception:
+        # Not being able to write the cache shouldn't stop anything.
+        pass
+
 
 def wgrib2_idx(grib2filepath):
     """
@@ -113,6 +224,459 @@ def wgrib2_idx(grib2filepath):
         raise RuntimeError("wgrib2 command was not found.")
 
 
+# Size of the remote GRIB2 files that were found to exist {url: size}
+_grib_sizes = {}
+
+# Remote GRIB2 files whose server answered a byte range request
+_grib_ranges = set()
+
+
+@functools.lru_cache(maxsize=512)
+def _fetch_idx_text(url):
+    """
+    Get the text of a remote index file.
+
+    An index file doesn't change once it exists, so it is only fetched
+    once per Python session, even for different Herbie objects.
+    """
+    with _session.get(url) as response:
+        if response.status_code != 200:
+            response.raise_for_status()
+            raise ValueError(
+                f"\nCant open index file {url}\n"
+                f"Download the full file first (with `H.download()`).\n"
+                f"You will need to remake the Herbie object (H = `Herbie()`)\n"
+                f"or delete this cached property: `del H.index_as_dataframe()`"
+            )
+        return response.text
+
+
+# Remote index files are also saved in `save_dir/.idx_cache/` so they
+# don't need to be downloaded again in a new Python session. Cached
+# files older than this are downloaded again.
+_idx_cache_max_age = timedelta(days=7)
+
+
+def _idx_cache_file(url, cache_dir):
+    """The file a remote index file is cached to in cache_dir."""
+    return cache_dir / hashlib.sha1(url.encode()).hexdigest()
+
+
+def _is_fresh(cache_file):
+    """Check if a cached index file exists and isn't too old."""
+    try:
+        age = datetime.now().timestamp() - cache_file.stat().st_mtime
+    except OSError:
+        return False
+    return age < _idx_cache_max_age.total_seconds()
+
+
+def _get_idx_text(url, cache_dir):
+    """
+    Get the text of a remote index file, using the cache on disk first.
+
+    Parameters
+    ----------
+    url : str
+        URL to the remote index file.
+    cache_dir : pathlib.Path or None
+        Directory for the cached index files. If None, the index file
+        isn't cached on disk.
+    """
+    if cache_dir is None:
+        return _fetch_idx_text(url)
+
+    cache_file = _idx_cache_file(url, cache_dir)
+    if _is_fresh(cache_file):
+        try:
+            return cache_file.read_text()
+        except OSError:
+            pass
+
+    text = _fetch_idx_text(url)
+
+    try:
+        # Write to a temporary file and rename it so another process
+        # never reads a partially written index file.
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(text)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log.info(f"Could not cache the index file {url}: {e}")
+
+    return text
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_searchString(searchString):
+    """Compile a searchString regular expression only once."""
+    return re.compile(searchString)
+
+
+def _search_this(df):
+    """
+    Join the DataFrame columns into the string searched by searchString.
+
+    i.e., ":TMP:2 m above ground:anl"
+    """
+    # (pandas >= 3 keeps missing values as NaN instead of "nan", and a
+    # NaN would make the whole row NaN when joined)
+    df = df.astype(str).fillna("nan")
+    joined = df.iloc[:, 0].str.cat([df[i] for i in df.columns[1:]], sep=":")
+    return ":" + joined.str.rstrip(":").str.replace(":nan:", ":", regex=False)
+
+
+def _range_header(byte_ranges):
+    """
+    Make the HTTP Range header value for a list of byte ranges.
+
+    Parameters
+    ----------
+    byte_ranges : list of tuples
+        The (start, end) byte of each range. The end byte is inclusive,
+        and None means "to the end of the file".
+    """
+    return "bytes=" + ",".join(
+        f"{start}-{'' if end is None else end}" for start, end in byte_ranges
+    )
+
+
+def _parse_byteranges(content, content_type):
+    """
+    Split a multipart/byteranges HTTP response into its parts.
+
+    Returns a list of (start, end, data) for each part, where the start
+    and end bytes come from each part's Content-Range header.
+    """
+    boundary = content_type.split("boundary=", 1)[1].split(";")[0]
+    boundary = boundary.strip().strip('"').encode()
+
+    parts = []
+    for part in content.split(b"--" + boundary)[1:]:
+        if part.startswith(b"--"):
+            # This is the closing boundary
+            break
+        headers, _, data = part.partition(b"\r\n\r\n")
+        for line in headers.decode("latin-1").splitlines():
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-range":
+                # i.e., "bytes 100-200/1000"
+                start, end = value.split()[1].split("/")[0].split("-")
+                start, end = int(start), int(end)
+                # (the data is followed by the CRLF before the next boundary)
+                parts.append((start, end, data[: end - start + 1]))
+    return parts
+
+
+def _merge_ranges(byte_ranges, gap_threshold=None):
+    """
+    Merge byte ranges that overlap or are close together.
+
+    Parameters
+    ----------
+    byte_ranges : list of tuples
+        The (start, end) byte of each range. The end byte is inclusive,
+        and None means "to the end of the file".
+    gap_threshold : int or None
+        Merge two ranges if there are no more than this many bytes
+        between them (0 merges ranges that touch or overlap).
+        Downloading a few unwanted bytes is often faster than making
+        another request. If None, the ranges are never merged.
+
+    Returns
+    -------
+    A sorted list of the merged (start, end) byte ranges.
+    """
+    if gap_threshold is None:
+        return sorted(byte_ranges, key=lambda x: x[0])
+
+    merged = []
+    for start, end in sorted(byte_ranges, key=lambda x: x[0]):
+        if merged:
+            last_start, last_end = merged[-1]
+            if last_end is None:
+                continue
+            if start - last_end - 1 <= gap_threshold:
+                if end is None or end > last_end:
+                    merged[-1] = (last_start, end)
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def _get_multi_range(url, byte_ranges):
+    """
+    Get several byte ranges of a remote file with one multi-range request.
+
+    Parameters
+    ----------
+    url : str
+        URL to the remote file.
+    byte_ranges : list of tuples
+        The (start, end) byte of each range. The end byte is inclusive,
+        and None means "to the end of the file".
+
+    Returns
+    -------
+    A list with the bytes for each range, or None if the server doesn't
+    support multi-range requests (many cloud object stores just return
+    the full file).
+    """
+    headers = dict(Range=_range_header(byte_ranges))
+    with _range_requests(url), _session.get(url, headers=headers, stream=True) as r:
+        content_type = r.headers.get("Content-Type", "")
+        is_multipart = r.status_code == 206 and content_type.startswith(
+            "multipart/byteranges"
+        )
+        if r.ok:
+            # The server ignores multi-range requests if it sends back
+            # the full file or only the first range, so don't ask it again.
+            _set_multi_range_support(url, is_multipart)
+        if not is_multipart:
+            # Closing the response here stops the download of the full
+            # file if the server ignored the ranges.
+            return None
+        parts = _parse_byteranges(r.content, content_type)
+
+    # The server may merge ranges that overlap or are close together,
+    # so cut each requested range out of the part that contains it.
+    contents = []
+    for start, end in byte_ranges:
+        for part_start, part_end, data in parts:
+            if part_start <= start <= part_end and (end is None or end <= part_end):
+                stop = None if end is None else end - part_start + 1
+                contents.append(data[start - part_start : stop])
+                break
+        else:
+            return None
+    return contents
+
+
+def _download_byte_ranges(
+    url, byte_ranges, outFile, max_threads=8, multi_range=True, gap_threshold=None
+):
+    """
+    Download byte ranges of a remote file into one local file.
+
+    When there is more than one range, all the ranges are first
+    requested at once with a multi-range request. If the server doesn't
+    support that (or multi_range is False), ranges closer together than
+    the gap_threshold are merged, and each merged range is downloaded
+    in its own thread. Only the requested bytes are written, each at its
+    place in the output file.
+
+    Parameters
+    ----------
+    url : str
+        URL to the remote file.
+    byte_ranges : list of tuples
+        The (start, end) byte of each range. The end byte is inclusive,
+        and None means "to the end of the file" (only allowed for the
+        last range).
+    outFile : pathlib.Path
+        The local file the ranges are written to, in order.
+    max_threads : int
+        Maximum number of ranges to download at the same time.
+    multi_range : bool
+        If True, try to get all the ranges with one request first.
+    gap_threshold : int or None
+        When downloading each range separately, merge ranges with no
+        more than this many bytes between them into one request. If
+        None, each range is downloaded with its own request.
+    """
+    # Write to a temporary file first. The file is made full size before
+    # the ranges are written, so a failed download must never be left
+    # with the real name (it would look like a complete file).
+    with _partial_file(outFile) as partFile:
+        _write_byte_ranges(
+            url, byte_ranges, partFile, max_threads, multi_range, gap_threshold
+        )
+
+
+@contextlib.contextmanager
+def _partial_file(outFile):
+    """
+    Give a temporary path to write outFile to.
+
+    The temporary file is renamed to outFile only if everything in the
+    with block worked; otherwise it is removed.
+    """
+    partFile = Path(f"{outFile}.partial")
+    try:
+        yield partFile
+    except BaseException:
+        if partFile.exists():
+            partFile.unlink()
+        raise
+    os.replace(partFile, outFile)
+
+
+def _write_byte_ranges(
+    url, byte_ranges, outFile, max_threads, multi_range, gap_threshold
+):
+    """Write the byte ranges to outFile (see _download_byte_ranges)."""
+    if multi_range and len(byte_ranges) > 1 and _multi_range_support(url) is not False:
+        contents = _get_multi_range(url, byte_ranges)
+        if contents is not None:
+            with open(outFile, "wb") as f:
+                for content in contents:
+                    f.write(content)
+            return
+
+    # Where each range goes in the output file
+    offsets = []
+    size = 0
+    for start, end in byte_ranges:
+        offsets.append(size)
+        if end is not None:
+            size += end - start + 1
+
+    # The requested ranges (and their output offsets) inside each of
+    # the merged ranges that are actually requested from the server.
+    merged_requests = {
+        merged_range: [] for merged_range in _merge_ranges(byte_ranges, gap_threshold)
+    }
+    for byte_range, offset in zip(byte_ranges, offsets):
+        for merged_start, merged_end in merged_requests:
+            if merged_start <= byte_range[0] and (
+                merged_end is None
+                or (byte_range[1] is not None and byte_range[1] <= merged_end)
+            ):
+                merged_requests[(merged_start, merged_end)].append(
+                    (*byte_range, offset)
+                )
+                break
+
+    with open(outFile, "wb") as f:
+        # Make the file the full size first so each thread can write its
+        # range at its own offset. Reserving the disk space up front
+        # (where the OS supports it) also keeps the file from fragmenting.
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except (AttributeError, OSError, ValueError):
+            f.truncate(size)
+
+        def _write(fd, offset, data):
+            """Write at the offset without moving a shared file position."""
+            data = memoryview(data)
+            while data:
+                n = os.pwrite(fd, data, offset)
+                data = data[n:]
+                offset += n
+
+        def _download(merged_range, wanted):
+            headers = dict(Range=_range_header([merged_range]))
+            with _range_requests(url), _session.get(
+                url, headers=headers, stream=True
+            ) as r, (
+                # Windows doesn't have pwrite, so each thread opens the file.
+                contextlib.nullcontext()
+                if hasattr(os, "pwrite")
+                else open(outFile, "r+b")
+            ) as thread_f:
+                r.raise_for_status()
+                if r.status_code == 206:
+                    position = merged_range[0]
+                else:
+                    # The server ignored the range and is sending the
+                    # full file, so skip to the bytes we want.
+                    position = 0
+                for chunk in r.iter_content(chunk_size=1024 * 1024):
+                    chunk_end = position + len(chunk)
+                    # Only keep the parts of the chunk that were asked
+                    # for and skip the bytes in the gaps between ranges.
+                    for start, end, offset in wanted:
+                        stop = chunk_end if end is None else min(chunk_end, end + 1)
+                        first = max(start, position)
+                        if first >= stop:
+                            continue
+                        data = chunk[first - position : stop - position]
+                        if hasattr(os, "pwrite"):
+                            # All threads write to the same open file.
+                            _write(f.fileno(), offset + first - start, data)
+                        else:
+                            thread_f.seek(offset + first - start)
+                            thread_f.write(data)
+                    position = chunk_end
+                    if merged_range[1] is not None and position > merged_range[1]:
+                        # Don't read the rest of a full file response.
+                        break
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_threads, len(merged_requests))
+        ) as pool:
+            futures = [
+                pool.submit(_download, merged_range, wanted)
+                for merged_range, wanted in merged_requests.items()
+            ]
+            for future in futures:
+                # Raise any errors from the threads
+                future.result()
+
+
+class _SourceChecks:
+    """
+    Check the remote sources for a file, in priority order.
+
+    A source is only checked when it is needed: when every source
+    before it doesn't have the file, or when the source before it is
+    slow to answer (then the next source gets checked at the same time
+    after a short head start). NOMADS is never checked early, because
+    it blocks users who send it too many requests.
+
+    Parameters
+    ----------
+    sources : dict
+        The remote sources and their URLs, in priority order.
+    check : function
+        Function that takes a source URL.
+    """
+
+    # Seconds to wait for a source before also checking the next one
+    head_start = 0.5
+
+    def __init__(self, sources, check):
+        self.sources = sources
+        self.check = check
+        self.futures = {}
+
+    def _check(self, url):
+        try:
+            return self.check(url)
+        except requests.exceptions.RequestException as e:
+            # One unreachable source shouldn't stop us from
+            # finding the file at another source.
+            log.info(f"Could not check {url}: {e}")
+            return None
+
+    def start(self, source):
+        """Start checking a source (if it isn't being checked already)."""
+        if source not in self.futures:
+            self.futures[source] = _check_pool.submit(self._check, self.sources[source])
+        return self.futures[source]
+
+    def cancel(self):
+        """Cancel the checks that haven't started (the answer isn't needed)."""
+        for future in self.futures.values():
+            future.cancel()
+
+    def result(self, source):
+        """Wait for the check of a source."""
+        future = self.start(source)
+        later = list(self.sources)[list(self.sources).index(source) + 1 :]
+        while True:
+            try:
+                return future.result(timeout=self.head_start)
+            except FuturesTimeoutError:
+                # The source is slow, so also check the next source
+                # (but never NOMADS) in case this one doesn't have it.
+                for i in later:
+                    if i not in self.futures and not i.startswith("nomads"):
+                        self.start(i)
+                        break
+
+
 class Herbie:
     """
     Locate GRIB2 file at one of the archive sources.
@@ -159,6 +723,11 @@ class Herbie:
         copy exists. If False (default), use the GRIB local copy if it
         exits. Note: it will still look for the idx file on the remote
         or try to generate the idx file if wgrib2 is installed.
+    cache_idx : bool
+        If True (default), keep a copy of remote index files in
+        ``save_dir/.idx_cache/`` so they don't need to be downloaded
+        again. Set to False to always get the index file from the
+        remote source.
     **kwargs
         Any other parameter needed to satisfy the conditions in the
         model template file (e.g., nest=2, other_label='run2')
@@ -178,6 +747,7 @@ class Herbie:
         save_dir=config["default"].get("save_dir"),
         overwrite=config["default"].get("overwrite", False),
         verbose=config["default"].get("verbose", True),
+        cache_idx=config["default"].get("cache_idx", True),
         **kwargs,
     ):
         """
@@ -203,6 +773,10 @@ class Herbie:
         self.save_dir = Path(save_dir).expand()
         self.overwrite = overwrite
         self.verbose = verbose
+        self.cache_idx = cache_idx
+
+        # Cache of the subset file name for each searchString
+        self._subset_prefixes = {}
 
         # Some model templates may require kwargs not listed (e.g., `nest=`, `member=`).
         for key, value in kwargs.items():
@@ -273,19 +847,17 @@ class Herbie:
 
     def __repr__(self):
         """Representation in Notebook"""
-        msg = (
-            f"{ANSI.herbie} {self.model.upper()} model",
-            f"{ANSI.italic}{self.product}{ANSI.reset} product initialized",
-            f"{ANSI.green}{self.date:%Y-%b-%d %H:%M UTC}{ANSI.bright_green} F{self.fxx:02d}{ANSI.reset}",
-            f"┊ {ANSI.orange}{ANSI.italic}source={self.grib_source}{ANSI.reset}",
+        return (
+            f"{ANSI.herbie} {self.model.upper()} model "
+            f"{ANSI.italic}{self.product}{ANSI.reset} product initialized "
+            f"{ANSI.green}{self.date:%Y-%b-%d %H:%M UTC}{ANSI.bright_green} F{self.fxx:02d}{ANSI.reset} "
+            f"┊ {ANSI.orange}{ANSI.italic}source={self.grib_source}{ANSI.reset}"
         )
-        return " ".join(msg)
 
     def __str__(self):
         """When Herbie class object is printed, print all properties."""
         # * Keep this simple so it runs fast.
-        msg = (f"║HERBIE╠ {self.model.upper()}:{self.product}",)
-        return " ".join(msg)
+        return f"║HERBIE╠ {self.model.upper()}:{self.product}"
 
     def tell_me_everything(self):
         """Print all the attributes of the Herbie object"""
@@ -308,11 +880,10 @@ class Herbie:
         if self.model.lower() == "alaska":
             self.model = "hrrrak"
 
-        _models = {m for m in dir(model_templates) if not m.startswith("__")}
         _products = set(self.PRODUCTS)
 
         assert self.date < datetime.utcnow(), "🔮 `date` cannot be in the future."
-        assert self.model in _models, f"`model` must be one of {_models}"
+        assert self.model in _models, f"`model` must be one of {set(_models)}"
         assert self.product in _products, f"`product` must be one of {_products}"
 
         if isinstance(self.IDX_SUFFIX, str):
@@ -329,17 +900,25 @@ class Herbie:
             # (I think this is true of all models).
             if "nomads" in self.priority:
                 expired = datetime.utcnow() - timedelta(days=14)
-                expired = pd.to_datetime(f"{expired:%Y-%m-%d}")
+                expired = expired.replace(hour=0, minute=0, second=0, microsecond=0)
                 if self.date < expired:
                     self.priority.remove("nomads")
 
-    def _ping_pando(self):
-        """Pinging the Pando server before downloading can prevent a bad handshake."""
-        try:
-            requests.head("https://pando-rgw01.chpc.utah.edu/")
-        except:
-            print("🤝🏻⛔ Bad handshake with pando? Am I able to move on?")
-            pass
+    def _check_sources(self, check):
+        """
+        Get the checks of the remote sources, in priority order.
+
+        Parameters
+        ----------
+        check : function
+            Function that takes a source URL.
+        """
+        remote = {
+            source: url
+            for source, url in self.SOURCES.items()
+            if not source.startswith("local")
+        }
+        return _SourceChecks(remote, check)
 
     def _check_grib(self, url, min_content_length=10):
         """
@@ -356,13 +935,29 @@ class Herbie:
             providing this right (see #114). I decreased to 10 and
             essentially turned off this check.
         """
-        head = requests.head(url)
-        check_exists = head.ok
-        if check_exists and "Content-Length" in head.raw.info():
-            check_content = int(head.raw.info()["Content-Length"]) > min_content_length
-            return check_exists and check_content
-        else:
-            return False
+        size = _grib_sizes.get(url)
+        if size is None:
+            # Ask for only the first byte instead of a HEAD request.
+            # The response tells us if the file exists and its full
+            # size, and it works on servers that don't allow HEAD.
+            headers = dict(Range="bytes=0-0")
+            with _session.get(
+                url, headers=headers, stream=True, timeout=_check_timeout
+            ) as r:
+                if r.status_code == 206 and "Content-Range" in r.headers:
+                    # i.e., "bytes 0-0/123456"
+                    size = r.headers["Content-Range"].rsplit("/", 1)[-1]
+                    _grib_ranges.add(url)
+                elif r.ok:
+                    # The server ignored the range and is sending the
+                    # full file (which is not read before closing).
+                    size = r.headers.get("Content-Length")
+            if size is None or not size.isdigit():
+                return False
+            size = int(size)
+            # Remember files that exist; a file may show up later if it doesn't.
+            _grib_sizes[url] = size
+        return size > min_content_length
 
     def _check_idx(self, url, verbose=False):
         """Check if an index file exist for the GRIB2 URL."""
@@ -380,7 +975,15 @@ class Herbie:
             else:
                 idx_url = url + i
 
-            idx_exists = requests.head(idx_url).ok
+            # An index file cached on disk exists without asking the
+            # server. Otherwise, a HEAD request is enough to check it
+            # exists; the file is only downloaded (and cached) when it
+            # is read.
+            cache_dir = self._idx_cache_dir
+            if cache_dir is not None and _is_fresh(_idx_cache_file(idx_url, cache_dir)):
+                idx_exists = True
+            else:
+                idx_exists = _session.head(idx_url, timeout=_check_timeout).ok
             if verbose:
                 print(f"🐜 {idx_url=}")
                 print(f"🐜 {idx_exists=}")
@@ -421,12 +1024,18 @@ class Herbie:
             }
 
         # Ok, NOW we are ready to search for the remote GRIB2 files...
+        # The sources are checked in priority order.
+        # (The shared session keeps connections alive, so we don't need
+        # to ping pando first to prevent a bad handshake.)
+        checks = self._check_sources(self._check_grib)
+        # Check for the index file at the first source while waiting for
+        # the GRIB2 check; find_idx needs the answer right after this.
+        self._idx_checks = self._check_sources(self._check_idx)
+        if self._idx_checks.sources:
+            self._idx_checks.start(next(iter(self._idx_checks.sources)))
+
+        found = [None, None]
         for source in self.SOURCES:
-            if "pando" in source:
-                # Sometimes pando returns a bad handshake. Pinging
-                # pando first can help prevent that.
-                self._ping_pando()
-
             # Get the file URL for the source and determine if the
             # GRIB2 file and the index file exist. If found, store the
             # URL for the GRIB2 file and the .idx file.
@@ -435,11 +1044,15 @@ class Herbie:
             if source.startswith("local"):
                 grib_path = Path(grib_url).expand()
                 if grib_path.exists():
-                    return [grib_path, source]
-            elif self._check_grib(grib_url):
-                return [grib_url, source]
+                    found = [grib_path, source]
+                    break
+            elif checks.result(source):
+                found = [grib_url, source]
+                break
 
-        return [None, None]
+        # Don't start checks of other sources we don't need anymore
+        checks.cancel()
+        return found
 
     def find_idx(self):
         """Find an index file for the GRIB file"""
@@ -453,13 +1066,18 @@ class Herbie:
                 key: self.SOURCES[key] for key in self.priority if key in self.SOURCES
             }
 
-        # Ok, NOW we are ready to search for the remote GRIB2 files...
+        # Ok, NOW we are ready to search for the remote index files...
+        # The sources are checked in priority order.
+        # (use the index checks started by find_grib if there are any)
+        checks = getattr(self, "_idx_checks", None)
+        self._idx_checks = None
+        if checks is None or set(checks.sources) - set(self.SOURCES):
+            if checks is not None:
+                checks.cancel()
+            checks = self._check_sources(self._check_idx)
+
+        found = [None, None]
         for source in self.SOURCES:
-            if "pando" in source:
-                # Sometimes pando returns a bad handshake. Pinging
-                # pando first can help prevent that.
-                self._ping_pando()
-
             # Get the file URL for the source and determine if the
             # GRIB2 file and the index file exist. If found, store the
             # URL for the GRIB2 file and the .idx file.
@@ -469,14 +1087,18 @@ class Herbie:
                 local_grib = Path(grib_url).expand()
                 local_idx = local_grib.with_suffix(self.IDX_SUFFIX[0])
                 if local_idx.exists():
-                    return [local_idx, "local"]
+                    found = [local_idx, "local"]
+                    break
             else:
-                idx_exists, idx_url = self._check_idx(grib_url)
+                idx_exists, idx_url = checks.result(source) or (False, None)
 
                 if idx_exists:
-                    return [idx_url, source]
+                    found = [idx_url, source]
+                    break
 
-        return [None, None]
+        # Don't start checks of other sources we don't need anymore
+        checks.cancel()
+        return found
 
     @property
     def get_remoteFileName(self, source=None):
@@ -490,70 +1112,77 @@ class Herbie:
         """Predict the local file name."""
         return self.LOCALFILE
 
+    def _subset_prefix(self, searchString):
+        """Make a unique filename prefix for a subset of the GRIB2 file."""
+        # Reassign the index DataFrame with the requested searchString
+        idx_df = self.read_idx(searchString)
+
+        # ======================================
+        # Make a unique filename for the subset
+
+        # Get a list of all GRIB message numbers. We will use this
+        # in the output file name as a unique identifier.
+        all_grib_msg = "-".join([f"{i:g}" for i in idx_df.index])
+
+        # To prevent "filename too long" error, create a hash to
+        # that represents the file name and subseted variables to
+        # shorten the name.
+
+        # I want the files to still be sorted by date, fxx, and
+        # subset fields, so include three separate hashes to similar
+        # files will be sorted together.
+
+        hash_date = hashlib.blake2b(
+            f"{self.date:%Y%m%d%H%M}".encode(), digest_size=1
+        ).hexdigest()
+
+        hash_fxx = hashlib.blake2b(f"{self.fxx}".encode(), digest_size=1).hexdigest()
+
+        hash_label = hashlib.blake2b(all_grib_msg.encode(), digest_size=2).hexdigest()
+
+        return f"subset_{hash_date}{hash_fxx}{hash_label}"
+
     def get_localFilePath(self, searchString=None):
         """Get full path to the local file"""
 
         # Predict the localFileName from the first model template SOURCE.
+        # (self.save_dir is already expanded when it is set)
         localFilePath = (
-            self.save_dir.expand()
-            / self.model
-            / f"{self.date:%Y%m%d}"
-            / self.get_localFileName
+            self.save_dir / self.model / f"{self.date:%Y%m%d}" / self.get_localFileName
         )
 
         # Check if any sources in a model template are "local"
         # (i.e., a custom template file)
-        if any([i.startswith("local") for i in self.SOURCES.keys()]):
-            localFilePath = next(
-                (
-                    Path(self.SOURCES[i]).expand()
-                    for i in self.SOURCES
-                    if i.startswith("local") and Path(self.SOURCES[i]).expand().exists()
-                ),
-                localFilePath,
-            )
+        local_paths = (
+            Path(url).expand()
+            for source, url in self.SOURCES.items()
+            if source.startswith("local")
+        )
+        localFilePath = next((i for i in local_paths if i.exists()), localFilePath)
 
         if searchString is not None:
-            # Reassign the index DataFrame with the requested searchString
-            idx_df = self.read_idx(searchString)
-
-            # ======================================
-            # Make a unique filename for the subset
-
-            # Get a list of all GRIB message numbers. We will use this
-            # in the output file name as a unique identifier.
-            all_grib_msg = "-".join([f"{i:g}" for i in idx_df.index])
-
-            # To prevent "filename too long" error, create a hash to
-            # that represents the file name and subseted variables to
-            # shorten the name.
-
-            # I want the files to still be sorted by date, fxx, and
-            # subset fields, so include three separate hashes to similar
-            # files will be sorted together.
-
-            hash_date = hashlib.blake2b(
-                f"{self.date:%Y%m%d%H%M}".encode(), digest_size=1
-            ).hexdigest()
-
-            hash_fxx = hashlib.blake2b(
-                f"{self.fxx}".encode(), digest_size=1
-            ).hexdigest()
-
-            hash_label = hashlib.blake2b(
-                all_grib_msg.encode(), digest_size=2
-            ).hexdigest()
+            # The subset file name only depends on the searchString, so
+            # only work it out once for each searchString.
+            prefix = self._subset_prefixes.get(searchString)
+            if prefix is None:
+                prefix = self._subset_prefixes[searchString] = self._subset_prefix(
+                    searchString
+                )
 
             # Prepend the filename with the hash label to distinguish it
             # from the full file. The hash label is a cryptic
             # representation of the GRIB messages in the subset.
-            localFilePath = (
-                localFilePath.parent
-                / f"subset_{hash_date}{hash_fxx}{hash_label}__{localFilePath.name}"
-            )
+            localFilePath = localFilePath.parent / f"{prefix}__{localFilePath.name}"
 
         return localFilePath
 
+    @property
+    def _idx_cache_dir(self):
+        """Directory for cached index files (None when not caching)."""
+        if self.cache_idx:
+            return self.save_dir / ".idx_cache"
+        return None
+
     @functools.cached_property
     def index_as_dataframe(self):
         """Read and cache the full index file"""
@@ -588,19 +1217,7 @@ class Herbie:
             if self.idx_source in ["local", "generated"]:
                 read_this_idx = self.idx
             else:
-                read_this_idx = None
-                response = requests.get(self.idx)
-                if response.status_code != 200:
-                    response.raise_for_status()
-                    response.close()
-                    raise ValueError(
-                        f"\nCant open index file {self.idx}\n"
-                        f"Download the full file first (with `H.download()`).\n"
-                        f"You will need to remake the Herbie object (H = `Herbie()`)\n"
-                        f"or delete this cached property: `del H.index_as_dataframe()`"
-                    )
-                read_this_idx = StringIO(response.text)
-                response.close()
+                read_this_idx = StringIO(_get_idx_text(self.idx, self._idx_cache_dir))
 
             df = pd.read_csv(
                 read_this_idx,
@@ -616,25 +1233,34 @@ class Herbie:
                     "??",
                     "???",
                 ],
+                # Set the numeric types while parsing instead of
+                # converting the columns afterwards.
+                # (grib_message may be like "3.1" for submessages)
+                dtype={"grib_message": "float64", "start_byte": "int64"},
+                engine="c",
             )
 
             # Format the DataFrame
+            # (there is usually only one reference time in the file)
             df["reference_time"] = pd.to_datetime(
-                df.reference_time, format="d=%Y%m%d%H"
+                df.reference_time, format="d=%Y%m%d%H", cache=True
             )
             df["valid_time"] = df["reference_time"] + pd.to_timedelta(f"{self.fxx}H")
-            df["start_byte"] = df["start_byte"].astype(int)
-            df["end_byte"] = df["start_byte"].shift(-1, fill_value="")
-            # TODO: Check this works: Assign the ending byte for the last row...
-            # TODO: df["end_byte"] = df["start_byte"].shift(-1, fill_value=requests.get(self.grib, stream=True).headers['Content-Length'])
-            # TODO: Based on what Karl Schnieder did.
-            df["range"] = df.start_byte.astype(str) + "-" + df.end_byte.astype(str)
+            # The index doesn't say where the last message ends, so keep
+            # the column as a nullable integer.
+            df["end_byte"] = df["start_byte"].shift(-1).astype("Int64")
+            # The last message ends at the end of the file. The file size
+            # is usually known already because the GRIB file was checked
+            # at the same time the index file was looked for, so no
+            # other request is needed. (Idea from Karl Schnieder)
+            grib_size = _grib_sizes.get(self.grib)
+            if grib_size is not None:
+                df["end_byte"] = df["end_byte"].fillna(grib_size - 1)
             df = df.reindex(
                 columns=[
                     "grib_message",
                     "start_byte",
                     "end_byte",
-                    "range",
                     "reference_time",
                     "valid_time",
                     "variable",
@@ -646,26 +1272,26 @@ class Herbie:
                 ]
             )
 
-            df = df.dropna(how="all", axis=1)
-            df = df.fillna("")
-
-            df["search_this"] = (
-                df.loc[:, "variable":]
-                .astype(str)
-                .apply(
-                    lambda x: ":" + ":".join(x).rstrip(":").replace(":nan:", ":"),
-                    axis=1,
-                )
+            # Drop the empty columns, but keep end_byte even when it is
+            # all <NA> (an index with one message in a file of unknown size).
+            df = df.drop(
+                columns=[
+                    i for i in df.columns if i != "end_byte" and df[i].isna().all()
+                ]
             )
+            df = df.fillna({i: "" for i in df.columns if i != "end_byte"})
+
+            df["search_this"] = _search_this(df.loc[:, "variable":])
 
         if self.IDX_STYLE == "eccodes":
             # eccodes keywords explained here:
             # https://confluence.ecmwf.int/display/UDOC/Identification+keywords
 
-            r = requests.get(self.idx)
-            idxs = [json.loads(x) for x in r.text.split("\n") if x]
-            r.close()
-            df = pd.DataFrame(idxs)
+            # Each line of the index file is a JSON record
+            text = _get_idx_text(self.idx, self._idx_cache_dir)
+            df = pd.read_json(
+                StringIO(text), lines=True, dtype=False, convert_dates=False
+            )
 
             # Format the DataFrame
             df.index = df.index.rename("grib_message")
@@ -673,7 +1299,6 @@ class Herbie:
             df = df.reset_index()
             df["start_byte"] = df["_offset"]
             df["end_byte"] = df["_offset"] + df["_length"]
-            df["range"] = df.start_byte.astype(str) + "-" + df.end_byte.astype(str)
             df["reference_time"] = pd.to_datetime(
                 df.date + df.time, format="%Y%m%d%H%M"
             )
@@ -685,7 +1310,6 @@ class Herbie:
                     "grib_message",
                     "start_byte",
                     "end_byte",
-                    "range",
                     "reference_time",
                     "valid_time",
                     "step",
@@ -702,14 +1326,7 @@ class Herbie:
                 ]
             )
 
-            df["search_this"] = (
-                df.loc[:, "param":]
-                .astype(str)
-                .apply(
-                    lambda x: ":" + ":".join(x).rstrip(":").replace(":nan:", ":"),
-                    axis=1,
-                )
-            )
+            df["search_this"] = _search_this(df.loc[:, "param":])
 
         # Attach some attributes
         df.attrs = dict(
@@ -749,14 +1366,31 @@ class Herbie:
 
         # Filter DataFrame by searchString
         if searchString not in [None, ":"]:
-            logic = df.search_this.str.contains(searchString)
+            if re.escape(searchString) == searchString:
+                # No special regex characters, so do a plain substring
+                # search, which is faster.
+                logic = df.search_this.str.contains(searchString, regex=False, na=False)
+            else:
+                logic = df.search_this.str.contains(
+                    _compile_searchString(searchString), na=False
+                )
             if logic.sum() == 0:
                 print(
                     f"No GRIB messages found. There might be something wrong with {searchString=}"
                 )
                 print(_searchString_help(kind=self.IDX_STYLE))
             df = df.loc[logic]
-        return df
+
+        # The byte range of each GRIB message is only needed for the
+        # messages we return, so make the strings after filtering.
+        byte_range = (
+            df.start_byte.astype(str) + "-" + df.end_byte.astype("string").fillna("")
+        )
+        df = df.assign(range=byte_range)
+        # Put the range column after end_byte
+        columns = list(df.columns[:-1])
+        columns.insert(columns.index("end_byte") + 1, "range")
+        return df[columns]
 
     def download(
         self,
@@ -767,6 +1401,7 @@ class Herbie:
         overwrite=None,
         verbose=None,
         errors="warn",
+        max_threads=8,
     ):
         """
         Download file from source.
@@ -800,6 +1435,11 @@ class Herbie:
             be unique.
         errors : {'warn', 'raise'}
             When an error occurs, send a warning or raise a value error.
+        max_threads : int
+            Maximum number of parts of the file to download at the same
+            time. Large files are downloaded in parts when the server
+            supports byte ranges. Set to 1 to download the full file
+            with a single request.
         """
 
         def _reporthook(a, b, c):
@@ -824,24 +1464,31 @@ class Herbie:
             """
             Download a subset specified by the regex searchString
             """
-            # TODO An alternative to downloadling subset with curl is
-            # TODO  to use the request module directly.
-            # TODO  >> headers = dict(Range=f"bytes={start_bytes}-{end_bytes}")
-            # TODO  >> r = requests.get(grib_url, headers=headers)
-
             grib_source = self.grib
-            if hasattr(grib_source, "as_posix") and grib_source.exists():
-                # The GRIB source is local. Curl the local file
-                # See https://stackoverflow.com/a/21023161/2383070
-                grib_source = f"file://{str(self.grib)}"
+            is_local = hasattr(grib_source, "as_posix") and grib_source.exists()
+            if not is_local:
+                # If the full file was already downloaded (i.e., by
+                # another Herbie object), cut the subset out of it
+                # instead of downloading the byte ranges again. The file
+                # must be the same size as the remote file, so a partly
+                # downloaded file is not used.
+                full_file = self.get_localFilePath()
+                remote_size = _grib_sizes.get(grib_source)
+                if (
+                    remote_size is not None
+                    and full_file.exists()
+                    and full_file.stat().st_size == remote_size
+                ):
+                    grib_source = full_file
+                    is_local = True
             if verbose:
                 print(
-                    f'📇 Download subset: {self.__repr__()}{" ":60s}\n cURL from {grib_source}'
+                    f'📇 Download subset: {self.__repr__()}{" ":60s}\n from {grib_source}'
                 )
 
-            # Download subsets of the file by byte range with cURL.
-            # > Instead of using a single curl command for each row,
-            # > group adjacent messages in the same curl command.
+            # Download subsets of the file by byte range.
+            # > Instead of requesting each row separately,
+            # > group adjacent messages in the same byte range.
 
             # Find index groupings
             # TODO: Improve this for readability
@@ -853,29 +1500,44 @@ class Herbie:
                 + [ind for ind, (i, j) in enumerate(zip(li, li[1:]), 1) if j - i > 1]
                 + [len(li) + 1]
             )
-            curl_groups = [li[i:j] for i, j in zip(inds, inds[1:])]
+            groups = [li[i:j] for i, j in zip(inds, inds[1:])]
 
-            curl_ranges = []
-            group_dfs = []
-            for i, group in enumerate(curl_groups):
+            byte_ranges = []
+            for group in groups:
                 _df = idx_df.loc[group]
-                curl_ranges.append(f"{_df.iloc[0].start_byte}-{_df.iloc[-1].end_byte}")
-                group_dfs.append(_df)
+                start_byte = int(_df.iloc[0].start_byte)
+                end_byte = _df.iloc[-1].end_byte
+                # The last message in the file doesn't have an end byte.
+                if pd.isna(end_byte):
+                    end_byte = None
+                else:
+                    end_byte = int(end_byte)
+                byte_ranges.append((start_byte, end_byte))
 
-            for i, (range, _df) in enumerate(zip(curl_ranges, group_dfs)):
                 if verbose:
-                    for i, row in _df.iterrows():
+                    for _, row in _df.iterrows():
                         print(
                             f"  {row.grib_message:<3g} {ANSI.orange}{row.search_this}{ANSI.reset}"
                         )
 
-                if i == 0:
-                    # If we are working on the first item, overwrite the existing file...
-                    curl = f"curl -s --range {range} {grib_source} > {outFile}"
-                else:
-                    # ...all other messages are appended to the subset file.
-                    curl = f"curl -s --range {range} {grib_source} >> {outFile}"
-                os.system(curl)
+            if is_local:
+                # The GRIB source is local, so copy the bytes directly.
+                with open(grib_source, "rb") as src, _partial_file(
+                    outFile
+                ) as partFile, open(partFile, "wb") as dst:
+                    for start_byte, end_byte in byte_ranges:
+                        src.seek(start_byte)
+                        if end_byte is None:
+                            dst.write(src.read())
+                        else:
+                            dst.write(src.read(end_byte - start_byte + 1))
+            else:
+                # Azure and other object stores don't accept multi-range
+                # requests, so fetch up to 1 MB of unwanted bytes between
+                # ranges rather than make another request for each range.
+                _download_byte_ranges(
+                    grib_source, byte_ranges, outFile, gap_threshold=1024 * 1024
+                )
 
             if verbose:
                 print(f"💾 Saved the subset to {outFile}")
@@ -884,21 +1546,13 @@ class Herbie:
         if save_dir is not None:
             self.save_dir = Path(save_dir).expand()
 
-        if not hasattr(Path(self.save_dir).expand(), "exists"):
-            self.save_dir = Path(self.save_dir).expand()
-
         # If the file exists in the localPath and we don't want to
         # overwrite, then we don't need to download it.
         outFile = self.get_localFilePath(searchString=searchString)
 
         if save_dir is not None:
             # Looks like the save_dir was changed.
-            outFile = (
-                self.save_dir.expand()
-                / self.model
-                / f"{self.date:%Y%m%d}"
-                / outFile.name
-            )
+            outFile = self.save_dir / self.model / f"{self.date:%Y%m%d}" / outFile.name
 
         # This overrides the overwrite specified in __init__
         if overwrite is not None:
@@ -947,7 +1601,66 @@ class Herbie:
 
         if searchString in [None, ":"] or self.idx is None:
             # Download the full file from remote source
-            urllib.request.urlretrieve(self.grib, outFile, _reporthook)
+            # (stream it with the shared session to reuse the connection)
+            chunk_size = 1024 * 1024
+
+            # The size is usually known from checking the file exists;
+            # if not, ask for it without starting the download.
+            total_size = _grib_sizes.get(self.grib)
+            accepts_ranges = self.grib in _grib_ranges
+            if total_size is None:
+                try:
+                    r = _session.head(
+                        self.grib, allow_redirects=True, timeout=_check_timeout
+                    )
+                    if r.ok:
+                        total_size = int(r.headers.get("Content-Length", 0))
+                        accepts_ranges = r.headers.get("Accept-Ranges") == "bytes"
+                except requests.exceptions.RequestException:
+                    pass  # download it with one request
+
+            # Cloud archives limit the speed of each connection, so
+            # download a large file in parts at the same time if the
+            # server accepts byte ranges. NOMADS throttles and blocks
+            # heavy users, so it only gets one connection.
+            grib_source = source if source is not None else self.grib_source
+            in_parts = (
+                max_threads > 1
+                and (total_size or 0) > 10 * chunk_size
+                and accepts_ranges
+                and not str(grib_source).startswith("nomads")
+            )
+
+            if not in_parts:
+                with _session.get(self.grib, stream=True) as r:
+                    r.raise_for_status()
+                    total_size = int(r.headers.get("Content-Length", 0))
+                    with _partial_file(outFile) as partFile, open(partFile, "wb") as f:
+                        for i, chunk in enumerate(r.iter_content(chunk_size), 1):
+                            f.write(chunk)
+                            if total_size:
+                                _reporthook(i, chunk_size, total_size)
+
+            if in_parts:
+                if verbose:
+                    print(
+                        f"🚛💨  Downloading {total_size / 1000000.0:.1f} MB in {max_threads} parts"
+                    )
+                part_size = -(-total_size // max_threads)
+                byte_ranges = [
+                    (start, min(start + part_size, total_size) - 1)
+                    for start in range(0, total_size, part_size)
+                ]
+                _download_byte_ranges(
+                    self.grib,
+                    byte_ranges,
+                    outFile,
+                    max_threads=max_threads,
+                    multi_range=False,
+                    # Never merge the parts; they touch, and merging
+                    # them would download the file with one request.
+                    gap_threshold=None,
+                )
 
             self.grib = outFile
             # self.grib_source = "local"  # ?? Why did I turn this off?
@@ -982,6 +1695,12 @@ class Herbie:
             before we downloaded it.
         """
 
+        # These are only needed to open the GRIB2 files, so they are
+        # imported here to make `import herbie` faster.
+        import cfgrib
+        import pygrib
+        from pyproj import CRS
+
         download_kwargs = {**dict(overwrite=False), **download_kwargs}
 
         local_file = self.get_localFilePath(searchString=searchString)
@@ -990,10 +1709,7 @@ class Herbie:
             # Looks like the save_dir was changed.
             self.save_dir = Path(download_kwargs["save_dir"]).expand()
             local_file = (
-                self.save_dir.expand()
-                / self.model
-                / f"{self.date:%Y%m%d}"
-                / local_file.name
+                self.save_dir / self.model / f"{self.date:%Y%m%d}" / local_file.name
             )
 
         #!==============================================================
@@ -1014,8 +1730,12 @@ class Herbie:
         #!==============================================================
 
         # Download file if local file does not exists
+        # (use the path download returns instead of working it out again)
         if not local_file.exists() or download_kwargs["overwrite"]:
-            self.download(searchString=searchString, **download_kwargs)
+            local_file = (
+                self.download(searchString=searchString, **download_kwargs)
+                or local_file
+            )
 
         # Backend kwargs for cfgrib
         backend_kwargs.setdefault("indexpath", "")
@@ -1034,9 +1754,14 @@ class Herbie:
         # Get CF grid projection information with pygrib and pyproj because
         # this is something cfgrib doesn't do (https://github.com/ecmwf/cfgrib/issues/251)
         # NOTE: Assumes the projection is the same for all variables
+        # (only the first message is read, then the file is closed so the
+        # handle isn't left open while cfgrib reads the file)
         grib = pygrib.open(str(local_file))
-        msg = grib.message(1)
-        cf_params = CRS(msg.projparams).to_cf()
+        try:
+            projparams = grib.message(1).projparams
+        finally:
+            grib.close()
+        cf_params = CRS(projparams).to_cf()
 
         # Funny stuff with polar stereographic (https://github.com/pyproj4/pyproj/issues/856)
         # TODO: Is there a better way to handle this? What about south pole?
@@ -12,44 +12,74 @@ See the `media release <https://www.ecmwf.int/en/about/media-centre/news/2022/ec
 - Disclaimer: ECMWF does not accept any liability whatsoever for any error or omission in the data, their availability, or for any loss or damage arising from their use.
 
 """
+__all__ = ["ecmwf"]
 
+import functools
+from types import MappingProxyType
 
-class ecmwf:
-    def template(self):
+# TODO: This will need to be updated someday
+VERSION = "0p4-beta"
+# VERSION = '0p4'
 
-        # TODO: This will need to be updated someday
-        version = "0p4-beta"
-        # version = '0p4'
+# These are the same for every Herbie object, so only make them once.
+# (they are read-only so one Herbie object can't change them for the others)
+DETAILS = MappingProxyType(
+    {
+        "ECMWF": "https://confluence.ecmwf.int/display/UDOC/ECMWF+Open+Data+-+Real+Time",
+    }
+)
+PRODUCTS = MappingProxyType(
+    {
+        "oper": "operational high-resolution forecast, atmospheric fields",
+        "enfo": "ensemble forecast, atmospheric fields",
+        "wave": "wave forecasts",
+        "waef": "ensemble forecast, ocean wave fields,",
+        # "scda": "short cut-off high-resolution forecast, atmospheric fields (also known as high-frequency products)",
+        # "scwv": "short cut-off high-resolution forecast, ocean wave fields (also known as high-frequency products)",
+        # "mmsf": "multi-model seasonal forecasts fields from the ECMWF model only.",
+    }
+)
+IDX_SUFFIX = (".index",)
 
-        self.DESCRIPTION = "ECMWF open data"
-        self.DETAILS = {
-            "ECMWF": "https://confluence.ecmwf.int/display/UDOC/ECMWF+Open+Data+-+Real+Time",
-        }
-        self.PRODUCTS = {
-            "oper": "operational high-resolution forecast, atmospheric fields",
-            "enfo": "ensemble forecast, atmospheric fields",
-            "wave": "wave forecasts",
-            "waef": "ensemble forecast, ocean wave fields,",
-            # "scda": "short cut-off high-resolution forecast, atmospheric fields (also known as high-frequency products)",
-            # "scwv": "short cut-off high-resolution forecast, ocean wave fields (also known as high-frequency products)",
-            # "mmsf": "multi-model seasonal forecasts fields from the ECMWF model only.",
-        }
 
-        # example file
-        # https://data.ecmwf.int/forecasts/20220126/00z/0p4-beta/oper/20220126000000-0h-oper-fc.grib2
+@functools.lru_cache(maxsize=4096)
+def _post_root(date, fxx, product, version):
+    """
+    The part of the file URL that is the same for all the sources.
+
+    Cached, because the same files are often looked for many times
+    (e.g., when making many Herbie objects in a loop).
+    """
+    # example file
+    # https://data.ecmwf.int/forecasts/20220126/00z/0p4-beta/oper/20220126000000-0h-oper-fc.grib2
+
+    # product suffix
+    if product in ["enfo", "waef"]:
+        product_suffix = "ef"
+    else:
+        product_suffix = "fc"
 
-        # product suffix
-        if self.product in ["enfo", "waef"]:
-            product_suffix = "ef"
-        else:
-            product_suffix = "fc"
+    # (formatting the date parts is faster than strftime)
+    ymd = f"{date.year:04d}{date.month:02d}{date.day:02d}"
+    hh = f"{date.hour:02d}"
+    mmss = f"{date.minute:02d}{date.second:02d}"
+
+    return f"{ymd}/{hh}z/{version}/{product}/{ymd}{hh}{mmss}-{fxx}h-{product}-{product_suffix}.grib2"
+
+
+class ecmwf:
+    def template(self):
+
+        self.DESCRIPTION = "ECMWF open data"
+        self.DETAILS = DETAILS
+        self.PRODUCTS = PRODUCTS
 
-        post_root = f"{self.date:%Y%m%d/%Hz}/{version}/{self.product}/{self.date:%Y%m%d%H%M%S}-{self.fxx}h-{self.product}-{product_suffix}.grib2"
+        post_root = _post_root(self.date, self.fxx, self.product, VERSION)
 
         self.SOURCES = {
             "azure": f"https://ai4edataeuwest.blob.core.windows.net/ecmwf/{post_root}",
             "ecmwf": f"https://data.ecmwf.int/forecasts/{post_root}",
         }
-        self.IDX_SUFFIX = [".index"]
+        self.IDX_SUFFIX = IDX_SUFFIX
         self.IDX_STYLE = "eccodes"  # 'wgrib2' or 'eccodes'
         self.LOCALFILE = f"{self.get_remoteFileName}"
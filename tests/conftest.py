@@ -0,0 +1,29 @@
+"""
+Run the tests that download from the same host one at a time.
+
+The tests can be run in parallel with pytest-xdist:
+
+    pytest -n auto --dist loadgroup tests/
+
+Tests marked with ``@pytest.mark.host("name")`` are put in the same
+xdist group, so tests that use the same host run one after another (and
+don't compete for the same rate limit), while tests for different hosts
+run at the same time. Tests that share the same downloaded files must
+also have the same host, so they don't remove files another test is
+reading.
+"""
+
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "host(name): the host the test downloads from")
+
+
+# Run before pytest-xdist's own hook, which reads the xdist_group marks.
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        marker = item.get_closest_marker("host")
+        if marker is not None:
+            item.add_marker(pytest.mark.xdist_group(marker.args[0]))
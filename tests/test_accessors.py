@@ -2,8 +2,13 @@
 Tests for Herbie xarray accessors
 """
 
+import pytest
+
 from herbie import Herbie
 
+# These tests download (and share) files from AWS; see conftest.py
+pytestmark = pytest.mark.host("aws")
+
 
 def test_crs():
     H = Herbie(
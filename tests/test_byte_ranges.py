@@ -0,0 +1,182 @@
+"""
+Tests for downloading byte ranges of a file (no internet needed).
+
+A local HTTP server stands in for the GRIB2 archives.
+"""
+import http.server
+import threading
+
+import pytest
+import requests
+
+from herbie import archive
+from herbie.archive import _download_byte_ranges
+
+data = bytes(range(256)) * 400  # 102,400 bytes
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve `data` with byte ranges, like the archives do.
+
+    The server's `mode` sets how a request for several ranges is answered:
+    "single" sends only the first range (like cloud object stores),
+    "multipart" sends a multipart/byteranges reply, and "ignore" ignores
+    all Range headers and sends the full file.
+    """
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("Range"))
+        rng = self.headers.get("Range")
+        if rng is None or self.server.mode == "ignore":
+            return self._send(200, data)
+
+        ranges = []
+        for r in rng.split("=", 1)[1].split(","):
+            start, end = r.strip().split("-")
+            end = int(end) if end else len(data) - 1
+            ranges.append((int(start), end))
+
+        if ranges[0][0] == self.server.fail_start:
+            return self._send(500, b"")
+
+        if len(ranges) > 1 and self.server.mode == "multipart":
+            return self._send_multipart(ranges)
+
+        self._send(206, data[ranges[0][0] : ranges[0][1] + 1], ranges[0])
+
+    def _send_multipart(self, ranges):
+        body = b""
+        for start, end in ranges:
+            body += (
+                b"\r\n--BOUNDARY\r\n"
+                b"Content-Type: application/octet-stream\r\n"
+                + f"Content-Range: bytes {start}-{end}/{len(data)}\r\n\r\n".encode()
+                + data[start : end + 1]
+            )
+        body += b"\r\n--BOUNDARY--\r\n"
+        self.send_response(206)
+        self.send_header("Content-Type", "multipart/byteranges; boundary=BOUNDARY")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status, body, byte_range=None):
+        self.send_response(status)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(body)))
+        if byte_range is not None:
+            start, end = byte_range
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    """Start a local range server; `server.requests` has each Range header."""
+    # Don't remember what the test servers support between tests.
+    monkeypatch.setattr(archive, "_host_caps", {})
+    monkeypatch.setattr(archive, "_host_caps_file", tmp_path / "host_caps.json")
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    srv.requests = []
+    srv.mode = "single"
+    srv.fail_start = None  # a range starting here gets an HTTP 500
+    srv.url = f"http://127.0.0.1:{srv.server_port}/file.grib2"
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_equal_parts_are_not_merged(server, tmp_path):
+    """Each part of a full file download is its own request."""
+    part_size = len(data) // 8
+    byte_ranges = [(i, i + part_size - 1) for i in range(0, len(data), part_size)]
+    outFile = tmp_path / "out.grib2"
+
+    _download_byte_ranges(server.url, byte_ranges, outFile, multi_range=False)
+
+    assert len(server.requests) == 8
+    assert outFile.read_bytes() == data
+
+
+def test_gap_threshold(server, tmp_path):
+    """Ranges close together are merged, but only the wanted bytes are kept."""
+    byte_ranges = [(0, 99), (500, 1499), (90000, 90999)]
+    outFile = tmp_path / "out.grib2"
+
+    _download_byte_ranges(
+        server.url, byte_ranges, outFile, multi_range=False, gap_threshold=1000
+    )
+
+    assert sorted(server.requests) == ["bytes=0-1499", "bytes=90000-90999"]
+    assert outFile.read_bytes() == data[0:100] + data[500:1500] + data[90000:91000]
+
+
+def test_failed_part_leaves_no_file(server, tmp_path):
+    """A failed download must not leave a full size file behind."""
+    server.fail_start = 50000
+    byte_ranges = [(0, 49999), (50000, len(data) - 1)]
+    outFile = tmp_path / "out.grib2"
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        _download_byte_ranges(server.url, byte_ranges, outFile, multi_range=False)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_single_range_reply_is_remembered(server, tmp_path):
+    """A host that only sends the first range isn't asked for several again."""
+    byte_ranges = [(0, 999), (5000, 5999)]
+    outFile = tmp_path / "out.grib2"
+
+    _download_byte_ranges(server.url, byte_ranges, outFile)
+    assert server.requests[0] == "bytes=0-999,5000-5999"
+    assert outFile.read_bytes() == data[0:1000] + data[5000:6000]
+    assert archive._multi_range_support(server.url) is False
+
+    server.requests.clear()
+    _download_byte_ranges(server.url, byte_ranges, outFile)
+    assert sorted(server.requests) == ["bytes=0-999", "bytes=5000-5999"]
+
+
+def test_remember_known_host(monkeypatch, tmp_path):
+    """Hosts in the static table can be remembered before the cache is read."""
+    monkeypatch.setattr(archive, "_host_caps", None)
+    monkeypatch.setattr(archive, "_host_caps_file", tmp_path / "host_caps.json")
+
+    url = "https://noaa-hrrr-bdp-pds.s3.amazonaws.com/file.grib2"
+    archive._set_multi_range_support(url, True)
+    assert archive._multi_range_support(url) is False
+
+
+@pytest.mark.parametrize("mode", ["multipart", "single", "ignore"])
+def test_download_byte_ranges(server, tmp_path, mode):
+    """Gaps between ranges and an open-ended last range, for each kind of server."""
+    server.mode = mode
+    byte_ranges = [(0, 99), (500, 1499), (100000, None)]
+    outFile = tmp_path / "out.grib2"
+
+    _download_byte_ranges(server.url, byte_ranges, outFile)
+
+    assert server.requests[0] == "bytes=0-99,500-1499,100000-"
+    if mode == "multipart":
+        # Everything came with the one request
+        assert len(server.requests) == 1
+    assert outFile.read_bytes() == data[0:100] + data[500:1500] + data[100000:]
+
+
+def test_parse_byteranges():
+    content = (
+        b"\r\n--abc\r\nContent-Type: text/plain\r\n"
+        b"Content-Range: bytes 0-4/20\r\n\r\nhello"
+        b"\r\n--abc\r\nContent-Range: bytes 10-14/20\r\n\r\nworld"
+        b"\r\n--abc--\r\n"
+    )
+    parts = archive._parse_byteranges(content, 'multipart/byteranges; boundary="abc"')
+    assert parts == [(0, 4, b"hello"), (10, 14, b"world")]
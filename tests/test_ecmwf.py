@@ -4,24 +4,32 @@
 """
 Tests for downloading ECMWF model
 """
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import pytest
 
 from herbie import Herbie
 
-now = datetime.now()
-yesterday = datetime(now.year, now.month, now.day - 1)
-today_str = yesterday.strftime("%Y-%m-%d %H:%M")
+# (midnight yesterday, subtracting a day works on the 1st of the month)
+yesterday = datetime.utcnow().replace(
+    hour=0, minute=0, second=0, microsecond=0
+) - timedelta(days=1)
 save_dir = "$TMPDIR/Herbie-Tests/"
 
 
-def test_ecmwf():
-    H = Herbie(
+@pytest.fixture(scope="module")
+def H():
+    """Only look for the files once for all the tests in this module."""
+    return Herbie(
         yesterday,
         model="ecmwf",
         product="oper",
         save_dir=save_dir,
     )
 
+
+@pytest.mark.host("ecmwf")
+def test_ecmwf(H):
     # Test full file download
     H.download()
     assert H.get_localFilePath().exists()
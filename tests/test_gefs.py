@@ -5,8 +5,13 @@
 Tests for downloading GFS model
 """
 
+import pytest
+
 from herbie.archive import Herbie
 
+# These tests download (and share) files from AWS; see conftest.py
+pytestmark = pytest.mark.host("aws")
+
 save_dir = "$TMPDIR/Herbie-Tests/"
 
 
@@ -7,8 +7,13 @@ Tests for downloading GFS model
 
 from datetime import datetime, timedelta
 
+import pytest
+
 from herbie import Herbie
 
+# These tests download (and share) files from AWS; see conftest.py
+pytestmark = pytest.mark.host("aws")
+
 now = datetime.now()
 today = datetime(now.year, now.month, now.day) - timedelta(hours=12)
 today_str = today.strftime("%Y-%m-%d %H:%M")
@@ -6,9 +6,14 @@ Tests for downloading HRRR model
 """
 from datetime import datetime, timedelta
 
+import pytest
+
 from herbie import Herbie, Path
 import os
 
+# These tests download (and share) files from AWS; see conftest.py
+pytestmark = pytest.mark.host("aws")
+
 now = datetime.now()
 today = datetime(now.year, now.month, now.day, now.hour) - timedelta(hours=6)
 yesterday = today - timedelta(days=1)
@@ -0,0 +1,20 @@
+"""
+Tests for reading index files (no internet needed).
+"""
+import numpy as np
+import pandas as pd
+
+from herbie.archive import _search_this
+
+
+def test_search_this_missing_key():
+    """A message without a level (i.e., 10u) can still be searched."""
+    df = pd.DataFrame(
+        {
+            "param": ["t", "10u"],
+            "levelist": ["1000", np.nan],
+            "levtype": ["pl", "sfc"],
+            "step": [0, 0],
+        }
+    )
+    assert _search_this(df).tolist() == [":t:1000:pl:0", ":10u:sfc:0"]
@@ -6,28 +6,28 @@ Tests for downloading RAP model
 """
 from herbie.archive import Herbie
 from datetime import datetime
-import pandas as pd
+import pytest
 
 
-today = pd.to_datetime("today").floor("1D")
+today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
 save_dir = "$TMPDIR/Herbie-Tests/"
 
 
-def test_rap_aws():
-    # Test
-    H = Herbie(
+@pytest.fixture(scope="module")
+def H():
+    """Only look for the files once for all the tests in this module."""
+    return Herbie(
         today,
         model="rap",
         save_dir=save_dir,
     )
+
+
+@pytest.mark.host("aws")
+def test_rap_aws(H):
     assert H.grib is not None
 
     # Test downloading the file
-    H = Herbie(
-        today,
-        model="rap",
-        save_dir=save_dir,
-    )
     H.download()
     assert H.get_localFilePath().exists()
 
@@ -35,6 +35,7 @@ def test_rap_aws():
     assert H.get_localFilePath("TMP:2 m").exists()
 
 
+@pytest.mark.host("ncei")
 def test_rap_historical():
     """Search for RAP urls on NCEI that I know exist"""
 
@@ -55,6 +56,7 @@ def test_rap_historical():
     assert H.grib is not None
 
 
+@pytest.mark.host("ncei")
 def test_rap_ncei():
     H = Herbie(
         "2020-03-15",
@@ -0,0 +1,159 @@
+"""
+Tests for the order Herbie checks the remote sources in (no internet needed).
+"""
+import http.server
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from herbie import archive
+from herbie.archive import Herbie, _SourceChecks
+
+sources = {
+    "aws": "aws-url",
+    "nomads": "nomads-url",
+    "google": "google-url",
+    "azure": "azure-url",
+}
+
+
+def make_check(has_file, delay={}):
+    """A check that records which sources were asked."""
+    asked = []
+
+    def check(url):
+        asked.append(url)
+        time.sleep(delay.get(url, 0))
+        return url in has_file
+
+    return check, asked
+
+
+def test_first_source_only():
+    """When the first source has the file, no other source is asked."""
+    check, asked = make_check(has_file=set(sources.values()))
+    checks = _SourceChecks(sources, check)
+    assert checks.result("aws")
+    assert asked == ["aws-url"]
+
+
+def test_next_source_after_miss():
+    check, asked = make_check(has_file={"google-url"})
+    checks = _SourceChecks(sources, check)
+    assert [checks.result(i) for i in sources] == [False, False, True, False]
+    assert asked == ["aws-url", "nomads-url", "google-url", "azure-url"]
+
+
+def test_slow_source_never_asks_nomads_early():
+    """A slow first source starts the next check, but never at NOMADS."""
+    check, asked = make_check(
+        has_file=set(sources.values()), delay={"aws-url": 3 * _SourceChecks.head_start}
+    )
+    checks = _SourceChecks(sources, check)
+    assert checks.result("aws")
+    assert "nomads-url" not in asked
+    assert "google-url" in asked
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Every source has every file."""
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", self.path))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.server.data)))
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        if self.path.split("/")[1] in self.server.slow:
+            time.sleep(3)
+        data = self.server.data
+        rng = self.headers.get("Range")
+        self.server.ranges.append(rng)
+        if rng is None:
+            self.send_response(200)
+            body = data
+        else:
+            start, end = rng.split("=", 1)[1].split("-")
+            start, end = int(start), int(end) if end else len(data) - 1
+            body = data[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """A model template with five sources on a local server."""
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.requests = []
+    srv.slow = set()  # sources that take 3 seconds to answer
+    srv.data = b"G" * 1000  # every file has this content
+    srv.ranges = []  # the Range header of each GET
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_port}"
+
+    class stub:
+        def template(self):
+            self.DESCRIPTION = "Test model"
+            self.DETAILS = {}
+            self.PRODUCTS = {"sfc": "surface"}
+            self.SOURCES = {
+                i: f"{url}/{i}/file.grib2"
+                for i in ["aws", "nomads", "google", "azure", "pando"]
+            }
+            self.LOCALFILE = "file.grib2"
+
+    monkeypatch.setattr(archive.model_templates, "stub", stub, raising=False)
+    monkeypatch.setattr(archive, "_models", archive._models | {"stub"})
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_herbie_only_asks_first_source(stub_model, tmp_path):
+    H = Herbie("2022-01-01", model="stub", priority=None, save_dir=tmp_path)
+    assert H.grib_source == "aws"
+    assert H.idx_source == "aws"
+    assert sorted(stub_model.requests) == [
+        ("GET", "/aws/file.grib2"),
+        ("HEAD", "/aws/file.grib2.idx"),
+    ]
+
+
+def test_check_timeout(stub_model, tmp_path, monkeypatch):
+    """A source that doesn't answer in time is skipped."""
+    monkeypatch.setattr(archive, "_check_timeout", 1)
+    stub_model.slow = {"aws"}
+
+    start = time.time()
+    H = Herbie("2022-01-01", model="stub", priority=None, save_dir=tmp_path)
+    assert time.time() - start < 2.5
+    assert H.grib_source == "nomads"
+    assert stub_model.requests.count(("GET", "/aws/file.grib2")) == 1
+
+
+@pytest.mark.parametrize("priority, parts", [("aws", 8), ("nomads", 1)])
+def test_download_full_file(stub_model, tmp_path, priority, parts):
+    """A large file is downloaded in parts, except from NOMADS."""
+    stub_model.data = bytes(range(256)) * (11 * 1024 * 4)  # 11 MB
+    # NOMADS only has recent data
+    date = datetime.utcnow().strftime("%Y-%m-%d")
+    H = Herbie(date, model="stub", priority=priority, save_dir=tmp_path)
+    stub_model.ranges.clear()
+
+    H.download(max_threads=8)
+
+    # The size is known from finding the file; no download is thrown away
+    assert len(stub_model.ranges) == parts
+    assert (None in stub_model.ranges) == (parts == 1)
+    assert H.get_localFilePath().read_bytes() == stub_model.data
@@ -4,6 +4,10 @@ Tests for Herbie tools like FastHerbie
 
 from herbie import FastHerbie
 import pandas as pd
+import pytest
+
+# These tests download (and share) files from AWS; see conftest.py
+pytestmark = pytest.mark.host("aws")
 
 save_dir = "$TMPDIR/Herbie-Tests/"
 